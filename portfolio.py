@@ -0,0 +1,150 @@
+import json
+import multiprocessing
+import queue
+import time
+from collections import Counter
+
+from puzzle_index import grid_hash
+from sudoku_solver import SudokuSolver, load_sudoku_grids
+
+# How often the race checks for workers that died without posting a result
+POLL_INTERVAL = 0.1
+
+# Each entry is passed to SudokuSolver, "name" identifies it in the logs.
+# No transposition table entry: a lone search never revisits a board, so it
+# would run the same search as "mrv" and only win on scheduling noise.
+DEFAULT_PORTFOLIO = [
+    {'name': 'mrv'},
+    {'name': 'mrv-descending', 'value_order': 'descending'},
+    {'name': 'mrv-random-1', 'value_order': 'random', 'seed': 1},
+    {'name': 'mrv-random-2', 'value_order': 'random', 'seed': 2},
+]
+
+
+def solve_with_config(grid, config):
+    """Solve a copy of the grid with one portfolio configuration"""
+    options = {k: v for k, v in config.items() if k != 'name'}
+    solver = SudokuSolver([row[:] for row in grid], **options)
+    solved = solver.solve_sudoku()
+    return solved, solver.board
+
+
+def _portfolio_worker(idx, grid, config, results):
+    t_start = time.time()
+    try:
+        solved, board = solve_with_config(grid, config)
+    except Exception as e:
+        results.put((idx, None, None, time.time() - t_start, repr(e)))
+        return
+    results.put((idx, solved, board, time.time() - t_start, None))
+
+
+def solve_portfolio(grid, configs=DEFAULT_PORTFOLIO, timeout=None, log_path=None):
+    """
+    Race every configuration on the same grid, one process each, and return
+    the first finisher as a dict with the winning config name. The other
+    processes are terminated. Any complete search settles solvability, so
+    an "unsolvable" answer wins just like a solution does.
+    Returns None when nothing finished within the timeout.
+    """
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_portfolio_worker, args=(idx, grid, config, results), daemon=True)
+        for idx, config in enumerate(configs)
+    ]
+    t_start = time.time()
+    for process in processes:
+        process.start()
+
+    outcome = None
+    failed = {}
+    try:
+        while len(failed) < len(configs):
+            remaining = None if timeout is None else timeout - (time.time() - t_start)
+            if remaining is not None and remaining <= 0:
+                break
+            wait = POLL_INTERVAL if remaining is None else min(POLL_INTERVAL, remaining)
+            # A worker flushes its result before exiting, so one already dead
+            # before an empty wait was killed (OOM, signal, segfault) without one
+            exited = [idx for idx, process in enumerate(processes)
+                      if idx not in failed and process.exitcode is not None]
+            try:
+                idx, solved, board, duration, error = results.get(timeout=wait)
+            except queue.Empty:
+                for idx in exited:
+                    failed[idx] = f"worker exited with code {processes[idx].exitcode} without a result"
+                continue
+            if error is not None:
+                # A crashing configuration must not end the race for the others
+                failed[idx] = error
+                continue
+            outcome = {
+                'winner': configs[idx]['name'],
+                'solved': solved,
+                'board': board,
+                'duration': duration,
+                'wall_time': time.time() - t_start,
+            }
+            break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    if log_path is not None:
+        record = {
+            'grid': grid_hash(grid),
+            'size': len(grid),
+            'configs': [config['name'] for config in configs],
+            'winner': outcome['winner'] if outcome else None,
+            'solved': outcome['solved'] if outcome else None,
+            'duration': outcome['duration'] if outcome else None,
+            'wall_time': time.time() - t_start,
+            'errors': {configs[idx]['name']: error for idx, error in sorted(failed.items())},
+        }
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+    return outcome
+
+
+def summarize_portfolio_log(log_path, size=None):
+    """
+    Win count per configuration from a portfolio log, optionally for one
+    grid size, and the number of races nobody won (timeouts, all failed).
+    """
+    wins = Counter()
+    unfinished = 0
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if size is not None and record['size'] != size:
+                continue
+            if record['winner'] is None:
+                unfinished += 1
+            else:
+                wins[record['winner']] += 1
+    return wins, unfinished
+
+
+if __name__ == "__main__":
+    sudoku_size = 25
+    file_path = "sudoku_grids/sudoku_grids_25.txt"
+    log_path = "portfolio_log.jsonl"
+    timeout = 300
+
+    for idx, grid in enumerate(load_sudoku_grids(file_path, sudoku_size)):
+        outcome = solve_portfolio(grid, timeout=timeout, log_path=log_path)
+        if outcome is None:
+            print(f"{idx+1} No configuration finished within {timeout}s")
+        else:
+            status = "solved" if outcome['solved'] else "no solution"
+            print(f"{idx+1} {status} by {outcome['winner']} in {outcome['duration']*1000:.1f}ms")
+
+    wins, unfinished = summarize_portfolio_log(log_path, size=sudoku_size)
+    print("Wins per configuration:")
+    for name, count in wins.most_common():
+        print(f"- {name}: {count}")
+    if unfinished:
+        print(f"Races without a winner: {unfinished}")
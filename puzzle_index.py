@@ -0,0 +1,233 @@
+import hashlib
+import json
+import math
+import os
+import random
+
+INDEX_FILENAME = ".sudoku_index.json"
+INDEX_VERSION = 1
+
+
+def grid_hash(grid):
+    """Content hash of a grid, identical grids in different files share it"""
+    text = ";".join(" ".join(str(x) for x in row) for row in grid)
+    return hashlib.sha1(text.encode('ascii')).hexdigest()
+
+
+def scan_grids(filepath):
+    """
+    Yield (name, byte offset of the first row, grid) for every valid grid
+    of a file, using the same "Grid XX" + rows layout as the app parser.
+    """
+    name, offset, current_grid = None, None, []
+
+    def finish():
+        if current_grid and all(len(row) == len(current_grid) for row in current_grid):
+            box_size = int(math.sqrt(len(current_grid)))
+            if box_size * box_size == len(current_grid):
+                return (name, offset, current_grid)
+        return None
+
+    position = 0
+    with open(filepath, 'rb') as f:
+        for raw in f:
+            line = raw.decode('utf-8').strip()
+            line_start = position
+            position += len(raw)
+
+            if line.startswith("Grid"):
+                if name is not None and (found := finish()):
+                    yield found
+                name, offset, current_grid = line, None, []
+                continue
+            if name is None:
+                continue
+            if not line:
+                if current_grid:
+                    if found := finish():
+                        yield found
+                    name, current_grid = None, []
+                continue
+            try:
+                row = [int(x) for x in line.split()]
+            except ValueError:
+                continue
+            if offset is None:
+                offset = line_start
+            current_grid.append(row)
+
+    if name is not None and (found := finish()):
+        yield found
+
+
+def read_grid_at(filepath, offset, size):
+    """Read back a single grid of the given size starting at a byte offset"""
+    grid = []
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        for raw in f:
+            line = raw.decode('utf-8').strip()
+            if not line:
+                continue
+            try:
+                grid.append([int(x) for x in line.split()])
+            except ValueError:
+                continue
+            if len(grid) == size:
+                break
+    return grid
+
+
+class PuzzleIndex:
+    """
+    On-disk index of every grid in a directory of .txt files, stored as a
+    JSON sidecar in that directory. Grids are keyed by content hash so
+    duplicates across files collapse to one entry; files are only re-parsed
+    when their mtime or size changes.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+        self.files = {}
+        self.grids = {}
+        self.by_size = {}
+        self.by_file = {}
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    self.files = data['files']
+                    self.grids = data['grids']
+            except (OSError, ValueError, KeyError):
+                self.files, self.grids = {}, {}
+        self.build_lookups()
+
+    def save(self):
+        data = {'version': INDEX_VERSION, 'files': self.files, 'grids': self.grids}
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self):
+        """Re-parse new or modified files, drop deleted ones. Returns True if anything changed"""
+        txt_files = sorted(f for f in os.listdir(self.directory) if f.endswith('.txt'))
+        changed = False
+
+        for filename in list(self.files):
+            if filename not in txt_files:
+                del self.files[filename]
+                changed = True
+
+        for filename in txt_files:
+            stat = os.stat(os.path.join(self.directory, filename))
+            known = self.files.get(filename)
+            if known and known['mtime'] == stat.st_mtime and known['size'] == stat.st_size:
+                continue
+            self.files[filename] = {
+                'mtime': stat.st_mtime,
+                'size': stat.st_size,
+                'grids': [
+                    [grid_hash(grid), offset, name, len(grid), sum(x != 0 for row in grid for x in row)]
+                    for name, offset, grid in scan_grids(os.path.join(self.directory, filename))
+                ],
+            }
+            changed = True
+
+        if changed:
+            self.assign_locations()
+            self.build_lookups()
+        return changed
+
+    def assign_locations(self):
+        # First occurrence in file order owns the entry, solve metadata survives moves
+        located = {}
+        for filename in sorted(self.files):
+            for h, offset, name, size, givens in self.files[filename]['grids']:
+                if h in located:
+                    located[h]['duplicates'] += 1
+                    continue
+                entry = self.grids.get(h, {})
+                located[h] = {
+                    'file': filename,
+                    'offset': offset,
+                    'name': name,
+                    'size': size,
+                    'givens': givens,
+                    'duplicates': 0,
+                    'solved': entry.get('solved'),
+                    'solve_time': entry.get('solve_time'),
+                    'difficulty': entry.get('difficulty', round(1 - givens / (size * size), 3)),
+                }
+        self.grids = located
+
+    def build_lookups(self):
+        self.by_size = {}
+        self.by_file = {}
+        for h, entry in self.grids.items():
+            self.by_size.setdefault(entry['size'], []).append(h)
+        # Every file a grid appears in, not only the one owning its entry
+        for filename in sorted(self.files):
+            hashes = []
+            for h, *_ in self.files[filename]['grids']:
+                if h in self.grids and h not in hashes:
+                    hashes.append(h)
+            if hashes:
+                self.by_file[filename] = hashes
+
+    def __len__(self):
+        return len(self.grids)
+
+    def __contains__(self, h):
+        return h in self.grids
+
+    def filter(self, size=None, filename=None):
+        """Hashes of the grids matching a size and/or file, in file order"""
+        if size is not None and filename is not None:
+            in_file = set(self.by_file.get(filename, []))
+            return [h for h in self.by_size.get(size, []) if h in in_file]
+        if size is not None:
+            return list(self.by_size.get(size, []))
+        if filename is not None:
+            return list(self.by_file.get(filename, []))
+        return list(self.grids)
+
+    def load_grid(self, h):
+        """
+        Read a grid back from the stored offset of its first occurrence. If the file changed since
+        it was indexed the index is refreshed first; a grid whose content is
+        no longer in the directory raises ValueError.
+        """
+        grid = self.read_entry(h)
+        if grid is not None and grid_hash(grid) == h:
+            return grid
+        self.refresh()
+        if h in self.grids:
+            grid = self.read_entry(h)
+            if grid is not None and grid_hash(grid) == h:
+                return grid
+        raise ValueError(f"Grid {h} is no longer in {self.directory}")
+
+    def read_entry(self, h):
+        entry = self.grids.get(h)
+        if entry is None:
+            return None
+        try:
+            return read_grid_at(os.path.join(self.directory, entry['file']), entry['offset'], entry['size'])
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def random_hash(self, size=None, rng=random):
+        return rng.choice(self.filter(size=size))
+
+    def record_solve(self, h, solved, solve_time, difficulty=None):
+        entry = self.grids[h]
+        entry['solved'] = solved
+        entry['solve_time'] = solve_time
+        if difficulty is not None:
+            entry['difficulty'] = difficulty
@@ -0,0 +1,245 @@
+import json
+import queue
+import struct
+import sys
+import threading
+from abc import ABC, abstractmethod
+
+from sudoku_solver import format_board
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+BINARY_MAGIC = b"SDKR"
+BINARY_VERSION = 1
+# id length, status, duration (s), board size, stats JSON length
+BINARY_RECORD = struct.Struct("<HBdBI")
+STATUS_CODES = {'solved': 1, 'unsolvable': 0}
+
+
+def make_result(input_id, board, solved, duration, **stats):
+    """One result record, the solution is only kept when the grid was solved"""
+    return {
+        'id': input_id,
+        'status': 'solved' if solved else 'unsolvable',
+        'solution': [row[:] for row in board] if solved else None,
+        'duration': duration,
+        'stats': stats,
+    }
+
+
+class TextStreamAdapter:
+    """Byte-stream face of a text stream, for a stdout without a buffer"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, data):
+        self.stream.write(bytes(data).decode('utf-8'))
+
+    def flush(self):
+        self.stream.flush()
+
+
+class ResultWriter(ABC):
+    """
+    Base sink collecting encoded result records in one large buffer that
+    is handed to the stream whenever it fills up. Writes to stdout when no
+    path is given.
+    """
+
+    def __init__(self, path=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        if path is None:
+            # Anything already printed must come out before our records
+            sys.stdout.flush()
+            buffer = getattr(sys.stdout, 'buffer', None)
+            # Text-only replacements (StringIO, notebooks) get decoded records
+            self.stream = buffer if buffer is not None else TextStreamAdapter(sys.stdout)
+            self.owns_stream = False
+        else:
+            self.stream = open(path, 'wb')
+            self.owns_stream = True
+        self.buffer_size = buffer_size
+        self.pending = bytearray()
+        self.count = 0
+        self.write_header()
+
+    def write_header(self):
+        pass
+
+    @abstractmethod
+    def encode(self, result):
+        """Bytes of one result record in this writer's format"""
+
+    def emit(self, data):
+        self.pending += data
+        if len(self.pending) >= self.buffer_size:
+            self.stream.write(self.pending)
+            self.pending.clear()
+
+    def write(self, result):
+        self.emit(self.encode(result))
+        self.count += 1
+
+    def flush(self):
+        if self.pending:
+            self.stream.write(self.pending)
+            self.pending.clear()
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+        if self.owns_stream:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JsonlResultWriter(ResultWriter):
+    def encode(self, result):
+        return (json.dumps(result, separators=(',', ':')) + "\n").encode('utf-8')
+
+
+class TextResultWriter(ResultWriter):
+    """One line per grid: id, status, duration in ms and the solution row by row"""
+
+    def encode(self, result):
+        solution = result['solution']
+        cells = "/".join(" ".join(map(str, row)) for row in solution) if solution else "-"
+        return f"{result['id']}\t{result['status']}\t{result['duration']*1000:.3f}\t{cells}\n".encode('utf-8')
+
+
+class BinaryResultWriter(ResultWriter):
+    """
+    Fixed header per record followed by the id, one byte per cell of the
+    solution (absent when unsolved) and the stats as JSON.
+    """
+
+    def write_header(self):
+        if isinstance(self.stream, TextStreamAdapter):
+            raise ValueError("Binary results need an output path when stdout is a text-only stream")
+        self.emit(BINARY_MAGIC + bytes([BINARY_VERSION]))
+
+    def encode(self, result):
+        input_id = str(result['id']).encode('utf-8')
+        solution = result['solution']
+        size = len(solution) if solution else 0
+        stats = json.dumps(result['stats'], separators=(',', ':')).encode('utf-8')
+        header = BINARY_RECORD.pack(len(input_id), STATUS_CODES[result['status']], result['duration'], size, len(stats))
+        cells = bytes(num for row in solution for num in row) if solution else b""
+        return header + input_id + cells + stats
+
+
+class PrettyResultWriter(ResultWriter):
+    """Debug format, the boxed board layout of print_board"""
+
+    def encode(self, result):
+        lines = [f"{result['id']} {result['status']} in {result['duration']*1000:.3f}ms"]
+        if result['solution']:
+            lines.append(format_board(result['solution']))
+        return ("\n".join(lines) + "\n\n").encode('utf-8')
+
+
+def read_binary_results(path):
+    """Decode a file produced by BinaryResultWriter back into result records"""
+    statuses = {code: status for status, code in STATUS_CODES.items()}
+    with open(path, 'rb') as f:
+        data = f.read()
+    header_len = len(BINARY_MAGIC) + 1
+    if len(data) < header_len or data[:len(BINARY_MAGIC)] != BINARY_MAGIC or data[len(BINARY_MAGIC)] != BINARY_VERSION:
+        raise ValueError(f"{path} is not a version {BINARY_VERSION} binary result file")
+
+    def take(pos, length):
+        if pos + length > len(data):
+            raise ValueError(f"{path} is truncated at byte {len(data)} inside record {len(results) + 1}")
+        return data[pos:pos + length]
+
+    results = []
+    pos = header_len
+    while pos < len(data):
+        id_len, status, duration, size, stats_len = BINARY_RECORD.unpack(take(pos, BINARY_RECORD.size))
+        pos += BINARY_RECORD.size
+        input_id = take(pos, id_len).decode('utf-8')
+        pos += id_len
+        solution = None
+        if size:
+            cells = take(pos, size * size)
+            solution = [list(cells[r * size:(r + 1) * size]) for r in range(size)]
+            pos += size * size
+        stats = json.loads(take(pos, stats_len))
+        pos += stats_len
+        if status not in statuses:
+            raise ValueError(f"{path} has an unknown status code {status} in record {len(results) + 1}")
+        results.append({'id': input_id, 'status': statuses[status], 'solution': solution,
+                        'duration': duration, 'stats': stats})
+    return results
+
+
+class ThreadedResultWriter:
+    """
+    Hands records to a background thread through a bounded queue so
+    encoding and I/O overlap with solving. The solving thread blocks when
+    the queue is full rather than buffering without limit.
+    """
+
+    _STOP = object()
+
+    def __init__(self, writer, max_queue=1024):
+        self.writer = writer
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            result = self.queue.get()
+            if result is self._STOP:
+                break
+            if self.error is None:
+                try:
+                    self.writer.write(result)
+                except Exception as e:
+                    self.error = e
+
+    def write(self, result):
+        if self.error is not None:
+            raise self.error
+        self.queue.put(result)
+
+    @property
+    def count(self):
+        return self.writer.count
+
+    def close(self):
+        self.queue.put(self._STOP)
+        self.thread.join()
+        self.writer.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+RESULT_WRITERS = {
+    'jsonl': JsonlResultWriter,
+    'text': TextResultWriter,
+    'binary': BinaryResultWriter,
+    'pretty': PrettyResultWriter,
+}
+
+
+def open_result_writer(output_format, path=None, threaded=False, buffer_size=DEFAULT_BUFFER_SIZE, max_queue=1024):
+    if output_format not in RESULT_WRITERS:
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {sorted(RESULT_WRITERS)}")
+    writer = RESULT_WRITERS[output_format](path, buffer_size=buffer_size)
+    if threaded:
+        return ThreadedResultWriter(writer, max_queue=max_queue)
+    return writer
@@ -1,10 +1,14 @@
 import streamlit as st
+import streamlit.components.v1 as components
+import functools
+import json
 import math
 import time
 from collections import defaultdict
 import copy
 import os
 from pathlib import Path
+from puzzle_index import PuzzleIndex
 
 class SudokuSolver:
     def __init__(self, board, track_steps=False):
@@ -15,6 +19,7 @@ class SudokuSolver:
         self.col_possibility = [defaultdict(int) for _ in range(self.board_size)]
         self.box_possibility = [defaultdict(int) for _ in range(self.board_size)]
         self.track_steps = track_steps
+        self.initial_board = [row[:] for row in board] if track_steps else None
         self.steps = []
         self.backtrack_count = 0
         self.cells_filled = 0
@@ -62,7 +67,6 @@ class SudokuSolver:
                 
                 if self.track_steps and len(self.steps) < 50:
                     self.steps.append({
-                        'board': copy.deepcopy(self.board),
                         'row': row,
                         'col': col,
                         'num': num,
@@ -77,7 +81,6 @@ class SudokuSolver:
                 
                 if self.track_steps and len(self.steps) < 50:
                     self.steps.append({
-                        'board': copy.deepcopy(self.board),
                         'row': row,
                         'col': col,
                         'num': num,
@@ -126,98 +129,162 @@ class SudokuSolver:
         self.box_possibility[box][num] = 1
 
 
-def display_sudoku_grid(board, title="Sudoku Grid", highlight_cell=None):
-    """Display a beautiful Sudoku grid with CSS styling"""
-    board_size = len(board)
+GRID_STYLES = """
+<style>
+    .sudoku-grid {
+        display: inline-block;
+        border: 3px solid #2c3e50;
+        background: #ecf0f1;
+        padding: 5px;
+        border-radius: 8px;
+        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+    }
+    .sudoku-row {
+        display: flex;
+        margin: 0;
+        padding: 0;
+    }
+    .sudoku-cell {
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        border: 1px solid #bdc3c7;
+        font-weight: bold;
+        font-family: 'Courier New', monospace;
+    }
+    .sudoku-grid.small .sudoku-cell { width: 45px; height: 45px; font-size: 18px; }
+    .sudoku-grid.medium .sudoku-cell { width: 35px; height: 35px; font-size: 14px; }
+    .sudoku-grid.large .sudoku-cell { width: 25px; height: 25px; font-size: 10px; }
+    .sudoku-cell.empty {
+        background: #ffffff;
+        color: #95a5a6;
+    }
+    .sudoku-cell.filled {
+        background: #3498db;
+        color: white;
+    }
+    .sudoku-cell.highlight {
+        background: #e74c3c;
+        color: white;
+        animation: pulse 0.5s;
+    }
+    .sudoku-cell.box-border-right {
+        border-right: 2px solid #2c3e50;
+    }
+    .sudoku-cell.box-border-bottom {
+        border-bottom: 2px solid #2c3e50;
+    }
+    @keyframes pulse {
+        0%, 100% { transform: scale(1); }
+        50% { transform: scale(1.1); }
+    }
+</style>
+"""
+
+
+def grid_scale(board_size):
+    return "small" if board_size <= 9 else "medium" if board_size <= 16 else "large"
+
+
+@functools.lru_cache(maxsize=None)
+def cell_class_template(board_size):
+    """Class string of every cell position (without the content state) for a board size"""
     box_size = int(math.sqrt(board_size))
-    
-    # Determine cell size based on board size
-    cell_size = 45 if board_size <= 9 else 35 if board_size <= 16 else 25
-    font_size = 18 if board_size <= 9 else 14 if board_size <= 16 else 10
-    
-    st.markdown(f"### {title}")
-    
-    # CSS for the grid
-    grid_html = f"""
-    <style>
-        .sudoku-grid {{
-            display: inline-block;
-            border: 3px solid #2c3e50;
-            background: #ecf0f1;
-            padding: 5px;
-            border-radius: 8px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .sudoku-row {{
-            display: flex;
-            margin: 0;
-            padding: 0;
-        }}
-        .sudoku-cell {{
-            width: {cell_size}px;
-            height: {cell_size}px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            border: 1px solid #bdc3c7;
-            font-size: {font_size}px;
-            font-weight: bold;
-            font-family: 'Courier New', monospace;
-        }}
-        .sudoku-cell.empty {{
-            background: #ffffff;
-            color: #95a5a6;
-        }}
-        .sudoku-cell.filled {{
-            background: #3498db;
-            color: white;
-        }}
-        .sudoku-cell.highlight {{
-            background: #e74c3c;
-            color: white;
-            animation: pulse 0.5s;
-        }}
-        .sudoku-cell.box-border-right {{
-            border-right: 2px solid #2c3e50;
-        }}
-        .sudoku-cell.box-border-bottom {{
-            border-bottom: 2px solid #2c3e50;
-        }}
-        @keyframes pulse {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.1); }}
-        }}
-    </style>
-    <div class="sudoku-grid">
-    """
-    
-    for i, row in enumerate(board):
-        grid_html += '<div class="sudoku-row">'
-        for j, num in enumerate(row):
-            classes = ["sudoku-cell"]
-            
-            if num == 0:
-                classes.append("empty")
-                display_num = "·"
-            else:
-                classes.append("filled")
-                display_num = str(num)
-            
-            if highlight_cell and highlight_cell == (i, j):
-                classes.append("highlight")
-            
+    templates = []
+    for i in range(board_size):
+        row = []
+        for j in range(board_size):
+            classes = "sudoku-cell"
             if (j + 1) % box_size == 0 and j < board_size - 1:
-                classes.append("box-border-right")
-            
+                classes += " box-border-right"
             if (i + 1) % box_size == 0 and i < board_size - 1:
-                classes.append("box-border-bottom")
-            
-            grid_html += f'<div class="{" ".join(classes)}">{display_num}</div>'
-        
-        grid_html += '</div>'
-    
-    grid_html += '</div>'
-    st.markdown(grid_html, unsafe_allow_html=True)
+                classes += " box-border-bottom"
+            row.append(classes)
+        templates.append(row)
+    return templates
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_grid_html(board, highlight_cell=None):
+    """Grid markup for a board given as a tuple of row tuples, cached by content"""
+    templates = cell_class_template(len(board))
+    rows = []
+    for i, row in enumerate(board):
+        cells = []
+        for j, num in enumerate(row):
+            state = "empty" if num == 0 else "filled"
+            if highlight_cell == (i, j):
+                state += " highlight"
+            cells.append(f'<div class="{templates[i][j]} {state}">{num or "·"}</div>')
+        rows.append('<div class="sudoku-row">' + "".join(cells) + '</div>')
+    return f'<div class="sudoku-grid {grid_scale(len(board))}">' + "".join(rows) + '</div>'
+
+
+def display_sudoku_grid(board, title="Sudoku Grid", highlight_cell=None):
+    """Display a beautiful Sudoku grid, relies on GRID_STYLES being on the page"""
+    st.markdown(f"### {title}")
+    board_key = tuple(tuple(row) for row in board)
+    st.markdown(render_grid_html(board_key, highlight_cell), unsafe_allow_html=True)
+
+
+STEP_PLAYER_SCRIPT = """
+<script>
+const data = __PAYLOAD__;
+const grid = document.getElementById("player-grid");
+const slider = document.getElementById("player-slider");
+const label = document.getElementById("player-label");
+const cells = grid.querySelectorAll(".sudoku-cell");
+const n = data.size;
+let current = -1;
+let highlighted = null;
+
+function setCell(row, col, num) {
+    const cell = cells[row * n + col];
+    cell.textContent = num ? num : "·";
+    cell.classList.toggle("filled", num !== 0);
+    cell.classList.toggle("empty", num === 0);
+}
+
+// Only the cells touched between the current and the target step are updated
+function goTo(target) {
+    while (current < target) {
+        current += 1;
+        const s = data.steps[current];
+        setCell(s.row, s.col, s.action === "place" ? s.num : 0);
+    }
+    while (current > target) {
+        const s = data.steps[current];
+        setCell(s.row, s.col, s.action === "place" ? 0 : s.num);
+        current -= 1;
+    }
+    if (highlighted) highlighted.classList.remove("highlight");
+    const s = data.steps[current];
+    highlighted = cells[s.row * n + s.col];
+    highlighted.classList.add("highlight");
+    const verb = s.action === "place" ? "➕ Place" : "➖ Remove";
+    label.innerHTML = `<b>Step ${current + 1}/${data.steps.length}:</b> ${verb} number <b>${s.num}</b> at position <b>(${s.row}, ${s.col})</b>`;
+}
+
+slider.addEventListener("input", () => goTo(parseInt(slider.value)));
+goTo(0);
+</script>
+"""
+
+
+def display_step_player(initial_board, steps):
+    """Play solving steps client-side from one payload instead of rerunning the app per step"""
+    board_size = len(initial_board)
+    payload = json.dumps({'size': board_size, 'steps': steps})
+    cell_px = {"small": 45, "medium": 35, "large": 25}[grid_scale(board_size)]
+    board_key = tuple(tuple(row) for row in initial_board)
+    player_html = (
+        GRID_STYLES
+        + f'<input id="player-slider" type="range" min="0" max="{len(steps) - 1}" value="0" style="width: 100%;">'
+        + '<p id="player-label" style="font-family: sans-serif;"></p>'
+        + f'<div id="player-grid">{render_grid_html(board_key)}</div>'
+        + STEP_PLAYER_SCRIPT.replace("__PAYLOAD__", payload)
+    )
+    components.html(player_html, height=board_size * (cell_px + 2) + 140, scrolling=True)
 
 
 def parse_sudoku_file(file_content):
@@ -278,34 +345,41 @@ def parse_sudoku_file(file_content):
 
 
 def load_grids_from_directory(directory_path):
-    """Load all sudoku grids from all .txt files in a directory"""
-    all_grids = []
-    
+    """Refresh the puzzle index of a directory, only new or modified .txt files are parsed"""
     if not os.path.exists(directory_path):
-        return all_grids
-    
-    # Get all .txt files
-    txt_files = sorted([f for f in os.listdir(directory_path) if f.endswith('.txt')])
-    
-    for filename in txt_files:
-        filepath = os.path.join(directory_path, filename)
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                grids_data = parse_sudoku_file(content)
-                
-                # Add filename info to each grid
-                for grid_data in grids_data:
-                    grid_data['filename'] = filename
-                    all_grids.append(grid_data)
-        except Exception as e:
-            st.warning(f"Could not read {filename}: {e}")
-    
-    return all_grids
+        return None
+
+    index = PuzzleIndex(directory_path)
+    try:
+        changed = index.refresh()
+    except Exception as e:
+        st.warning(f"Could not index {directory_path}: {e}")
+        return None
+    if changed:
+        save_index(index)
+    return index
+
+
+def save_index(index):
+    """Persist the index sidecar, a read-only directory keeps the in-memory index"""
+    try:
+        index.save()
+    except OSError as e:
+        st.warning(f"Could not save the puzzle index in {index.directory}, using it in memory only: {e}")
+
+
+def index_grid_summary(index, grid_hash, filename=None):
+    """
+    Grid metadata in the shape the app uses, the grid itself is read on demand.
+    filename labels a duplicate by the file it was filtered on.
+    """
+    entry = index.grids[grid_hash]
+    return {'name': entry['name'], 'size': entry['size'], 'filename': filename or entry['file'], 'hash': grid_hash}
 
 
 # Streamlit App
 st.set_page_config(page_title="Sudoku Solver", page_icon="🧩", layout="wide")
+st.markdown(GRID_STYLES, unsafe_allow_html=True)
 
 st.title("🧩 Sudoku Solver with Visual Steps")
 st.markdown("Load Sudoku puzzles from a directory or upload individual files")
@@ -313,6 +387,8 @@ st.markdown("Load Sudoku puzzles from a directory or upload individual files")
 # Initialize session state
 if 'all_grids' not in st.session_state:
     st.session_state.all_grids = []
+if 'puzzle_index' not in st.session_state:
+    st.session_state.puzzle_index = None
 
 # Sidebar
 with st.sidebar:
@@ -328,19 +404,18 @@ with st.sidebar:
     
     if st.button("🔄 Load All Grids"):
         with st.spinner("Loading grids..."):
-            st.session_state.all_grids = load_grids_from_directory(dir_path)
+            index = load_grids_from_directory(dir_path)
+            st.session_state.puzzle_index = index if index else None
+            st.session_state.all_grids = [index_grid_summary(index, h) for h in index.filter()] if index else []
             if st.session_state.all_grids:
-                st.success(f"✅ Loaded {len(st.session_state.all_grids)} grids!")
+                duplicates = sum(entry['duplicates'] for entry in index.grids.values())
+                st.success(f"✅ Loaded {len(st.session_state.all_grids)} unique grids!"
+                           + (f" ({duplicates} duplicates skipped)" if duplicates else ""))
                 
                 # Show statistics
-                sizes = {}
-                for grid_data in st.session_state.all_grids:
-                    size = grid_data['size']
-                    sizes[size] = sizes.get(size, 0) + 1
-                
                 st.info("Grid sizes found:")
-                for size, count in sorted(sizes.items()):
-                    st.write(f"- {size}x{size}: {count} grids")
+                for size, hashes in sorted(index.by_size.items()):
+                    st.write(f"- {size}x{size}: {len(hashes)} grids")
             else:
                 st.error("No grids found!")
     
@@ -358,33 +433,46 @@ if uploaded_file is not None:
         grid_data['filename'] = uploaded_file.name
     
     st.session_state.all_grids = uploaded_grids
+    st.session_state.puzzle_index = None
     st.success(f"✅ Loaded {len(uploaded_grids)} grid(s) from uploaded file")
 
 # Display grids
 if st.session_state.all_grids:
+    index = st.session_state.puzzle_index
+
     # Filter options
     st.markdown("---")
     col_filter1, col_filter2 = st.columns(2)
     
     with col_filter1:
         # Get unique sizes
-        available_sizes = sorted(set(g['size'] for g in st.session_state.all_grids))
+        if index:
+            available_sizes = sorted(index.by_size)
+        else:
+            available_sizes = sorted(set(g['size'] for g in st.session_state.all_grids))
         selected_size = st.selectbox("Filter by size", ["All"] + [f"{s}x{s}" for s in available_sizes])
     
     with col_filter2:
         # Get unique filenames
-        available_files = sorted(set(g['filename'] for g in st.session_state.all_grids))
+        if index:
+            available_files = sorted(index.by_file)
+        else:
+            available_files = sorted(set(g['filename'] for g in st.session_state.all_grids))
         selected_file = st.selectbox("Filter by file", ["All"] + available_files)
     
     # Apply filters
-    filtered_grids = st.session_state.all_grids
-    
-    if selected_size != "All":
-        size = int(selected_size.split('x')[0])
-        filtered_grids = [g for g in filtered_grids if g['size'] == size]
+    size = int(selected_size.split('x')[0]) if selected_size != "All" else None
+    filename = selected_file if selected_file != "All" else None
     
-    if selected_file != "All":
-        filtered_grids = [g for g in filtered_grids if g['filename'] == selected_file]
+    if index:
+        filtered_grids = [index_grid_summary(index, h, filename)
+                          for h in index.filter(size=size, filename=filename)]
+    else:
+        filtered_grids = st.session_state.all_grids
+        if size is not None:
+            filtered_grids = [g for g in filtered_grids if g['size'] == size]
+        if filename is not None:
+            filtered_grids = [g for g in filtered_grids if g['filename'] == filename]
     
     st.info(f"Showing {len(filtered_grids)} grid(s)")
     
@@ -397,7 +485,15 @@ if st.session_state.all_grids:
         )
         
         grid_data = filtered_grids[selected_idx]
-        grid = grid_data['grid']
+        if index:
+            try:
+                grid = index.load_grid(grid_data['hash'])
+            except ValueError:
+                st.warning(f"{grid_data['name']} changed on disk since the grids were loaded, "
+                           "click \"Load All Grids\" again")
+                st.stop()
+        else:
+            grid = grid_data['grid']
         grid_size = grid_data['size']
         
         st.markdown("---")
@@ -418,6 +514,10 @@ if st.session_state.all_grids:
                 solved = solver.solve_sudoku()
                 duration = time.time() - t_start
                 
+                if index:
+                    index.record_solve(grid_data['hash'], solved, duration)
+                    save_index(index)
+                
                 with col2:
                     if solved:
                         display_sudoku_grid(solver.board, "✅ Solved Puzzle")
@@ -447,17 +547,7 @@ if st.session_state.all_grids:
                     st.markdown("---")
                     st.subheader("🎬 Solving Steps (First 50)")
                     
-                    step_idx = st.slider("Step", 0, len(solver.steps)-1, 0)
-                    step = solver.steps[step_idx]
-                    
-                    action_emoji = "➕" if step['action'] == 'place' else "➖"
-                    st.markdown(f"**Step {step_idx + 1}/{len(solver.steps)}:** {action_emoji} "
-                               f"{'Place' if step['action'] == 'place' else 'Remove'} "
-                               f"number **{step['num']}** at position "
-                               f"**({step['row']}, {step['col']})**")
-                    
-                    display_sudoku_grid(step['board'], f"Board at Step {step_idx + 1}", 
-                                       highlight_cell=(step['row'], step['col']))
+                    display_step_player(solver.initial_board, solver.steps)
     else:
         st.warning("No grids match the selected filters")
 
@@ -1,12 +1,120 @@
 import math
+import random
+import sys
 import time
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+
+
+class TranspositionTable:
+    """
+    Bounded table of board positions already proven unsolvable, keyed by
+    their Zobrist hash. When full, the least recently used entry is evicted.
+
+    A single depth-first search never reaches the same board twice, so the
+    table only prunes when it is shared between searches: successive
+    re-solves of a SolverSession, or every grid of one size in a batch.
+    Sharing is sound since a dead board is dead whichever cells were givens.
+    """
+
+    def __init__(self, max_entries=100000, max_memory_mb=None):
+        self.entries = OrderedDict()
+        self.max_entries = max_entries
+        if max_memory_mb is not None:
+            # One slot in the table costs roughly one int key + one node
+            per_entry = sys.getsizeof(1 << 63) + 2 * sys.getsizeof(None) + 48
+            by_memory = int(max_memory_mb * 1024 * 1024) // per_entry
+            self.max_entries = max(1, min(self.max_entries, by_memory))
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def probe(self, key):
+        """Search-time lookup: counted in the stats and refreshes the LRU order"""
+        self.lookups += 1
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return
+        self.entries[key] = True
+        self.stores += 1
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def memory_bytes(self):
+        # Container overhead plus the int keys (the True values are shared)
+        return sys.getsizeof(self.entries) + sum(sys.getsizeof(k) for k in self.entries)
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': self.hit_rate(),
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'memory_bytes': self.memory_bytes(),
+        }
+
+
+def zobrist_keys(board_size, seed=0):
+    """
+    Random 64-bit key for every (row, col, num) triple, indexed as
+    keys[row][col][num]. Index 0 (empty cell) is always 0.
+    """
+    rng = random.Random(seed)
+    return [
+        [[0] + [rng.getrandbits(64) for _ in range(board_size)] for _ in range(board_size)]
+        for _ in range(board_size)
+    ]
+
+
+CELL_HEURISTICS = ('mrv', 'first')
+VALUE_ORDERS = ('ascending', 'descending', 'random')
+
 
 class SudokuSolver:
-    def __init__(self, board):
+    def __init__(self, board, transposition_table=None, heuristic='mrv', value_order='ascending', seed=None):
         self.board = board
         self.board_size = len(board)
         self.box_size = int(math.sqrt(self.board_size))
+        if heuristic not in CELL_HEURISTICS:
+            raise ValueError(f"Unknown heuristic {heuristic!r}, expected one of {CELL_HEURISTICS}")
+        if value_order not in VALUE_ORDERS:
+            raise ValueError(f"Unknown value order {value_order!r}, expected one of {VALUE_ORDERS}")
+        self.find_empty = self.find_best_empty if heuristic == 'mrv' else self.find_empty_dummy
+        self.values = list(range(1, self.board_size + 1))
+        if value_order == 'descending':
+            self.values.reverse()
+        self.rng = random.Random(seed) if value_order == 'random' else None
+        self.transposition_table = transposition_table
+        self.zobrist = None
+        self.zobrist_hash = 0
+        if transposition_table is not None:
+            self.zobrist = zobrist_keys(self.board_size)
+            for r in range(self.board_size):
+                for c in range(self.board_size):
+                    self.zobrist_hash ^= self.zobrist[r][c][self.board[r][c]]
         self.row_possibility = [defaultdict(int) for _ in range(self.board_size)]
         self.col_possibility = [defaultdict(int) for _ in range(self.board_size)]
         self.box_possibility = [defaultdict(int) for _ in range(self.board_size)]
@@ -41,12 +149,23 @@ class SudokuSolver:
                     self.box_possibility[box][num] = 1
 
     def solve_sudoku(self):
-        empty = self.find_best_empty()
+        # Board already proven dead by an earlier search sharing the table,
+        # probed before the MRV scan so a pruned node costs one lookup
+        table = self.transposition_table
+        if table is not None and table.probe(self.zobrist_hash):
+            return False
+
+        empty = self.find_empty()
         if not empty:
             return True
         row, col = empty
 
-        for num in range(1, self.board_size + 1):
+        values = self.values
+        if self.rng is not None:
+            values = values[:]
+            self.rng.shuffle(values)
+
+        for num in values:
             if self.is_valid(row, col, num):
                 self.place_number(row, col, num)
 
@@ -54,6 +173,9 @@ class SudokuSolver:
                     return True
 
                 self.remove_number(row, col, num)
+
+        if table is not None:
+            table.add(self.zobrist_hash)
         return False
 
     def find_empty_dummy(self):
@@ -92,6 +214,8 @@ class SudokuSolver:
 
     def place_number(self, row, col, num):
         self.board[row][col] = num
+        if self.zobrist is not None:
+            self.zobrist_hash ^= self.zobrist[row][col][num]
         box = (row // self.box_size) * self.box_size + (col // self.box_size)
         self.row_possibility[row][num] = 0
         self.col_possibility[col][num] = 0
@@ -99,33 +223,139 @@ class SudokuSolver:
 
     def remove_number(self, row, col, num):
         self.board[row][col] = 0
+        if self.zobrist is not None:
+            self.zobrist_hash ^= self.zobrist[row][col][num]
         box = (row // self.box_size) * self.box_size + (col // self.box_size)
         self.row_possibility[row][num] = 1
         self.col_possibility[col][num] = 1
         self.box_possibility[box][num] = 1
 
     def print_board(self):
-        # Determine the max width of any number or dot
-        max_width = max(
-            len(str(num)) for row in self.board for num in row
-        )
-        dot = ".".rjust(max_width)
+        print(format_board(self.board))
+
 
-        # Build horizontal separator based on box size and max width
-        sep = "|" + "+".join(["-" * ((self.box_size * (max_width + 1)) + 1)] * self.box_size) + "|"
+def format_board(board):
+    """Boxed text layout of a board, one line per row with box separators"""
+    board_size = len(board)
+    box_size = int(math.sqrt(board_size))
 
-        for i, row in enumerate(self.board):
-            row_str = "| "
-            for j, num in enumerate(row):
-                cell = (str(num) if num != 0 else dot).rjust(max_width)
-                row_str += cell + " "
-                if (j + 1) % self.box_size == 0:
-                    row_str += "| "
-            print(row_str)
+    # Determine the max width of any number or dot
+    max_width = max(len(str(num)) for row in board for num in row)
+    dot = ".".rjust(max_width)
 
-            if (i + 1) % self.box_size == 0 and i != self.board_size - 1:
-                print(sep)
+    # Build horizontal separator based on box size and max width
+    sep = "|" + "+".join(["-" * ((box_size * (max_width + 1)) + 1)] * box_size) + "|"
 
+    lines = []
+    for i, row in enumerate(board):
+        cells = [(str(num) if num != 0 else dot).rjust(max_width) for num in row]
+        boxes = [" ".join(cells[b:b + box_size]) for b in range(0, board_size, box_size)]
+        lines.append("| " + " | ".join(boxes) + " | ")
+
+        if (i + 1) % box_size == 0 and i != board_size - 1:
+            lines.append(sep)
+    return "\n".join(lines)
+
+
+class SolverSession:
+    """
+    Persistent solver for a puzzle whose givens are edited interactively.
+    The last solution is kept and reused when an edit leaves it consistent;
+    otherwise only the band and stack of boxes around the edited cell are
+    cleared and re-searched, falling back to a full solve if that fails.
+    """
+
+    def __init__(self, grid, transposition_table=None):
+        self.givens = [row[:] for row in grid]
+        self.transposition_table = transposition_table
+        self.board_size = len(grid)
+        self.box_size = int(math.sqrt(self.board_size))
+        self.solver = None
+        self.solved = None
+        self.last_update = None
+
+    @property
+    def board(self):
+        return self.solver.board if self.solver is not None else self.givens
+
+    def solve(self):
+        if self.solved is None:
+            self.solver = SudokuSolver([row[:] for row in self.givens], transposition_table=self.transposition_table)
+            self.solved = self.solver.solve_sudoku()
+            self.last_update = 'resolved'
+        return self.solved
+
+    def add_given(self, row, col, num):
+        if num == 0:
+            return self.remove_given(row, col)
+        if not 1 <= num <= self.board_size:
+            raise ValueError(f"{num} is out of range, givens go from 1 to {self.board_size}")
+        if self.givens[row][col] == num:
+            return self.solved
+        # Peers never include the cell itself, so a given being replaced is ignored
+        if not self.given_is_consistent(row, col, num):
+            raise ValueError(f"{num} at ({row}, {col}) conflicts with another given")
+        if self.givens[row][col] != 0:
+            self.remove_given(row, col)
+        self.givens[row][col] = num
+
+        if self.solved is None:
+            return self.solve()
+        if not self.solved:
+            # Adding a constraint to an unsolvable puzzle cannot fix it
+            self.last_update = 'reused'
+            return False
+        if self.solver.board[row][col] == num:
+            self.last_update = 'reused'
+            return True
+        if self.repair(row, col, num):
+            self.last_update = 'repaired'
+            return True
+
+        self.solved = None
+        return self.solve()
+
+    def remove_given(self, row, col):
+        if self.givens[row][col] == 0:
+            return self.solved
+        self.givens[row][col] = 0
+        if self.solved:
+            # Dropping a constraint keeps the current solution valid
+            self.last_update = 'reused'
+            return True
+        self.solved = None
+        return self.solve()
+
+    def given_is_consistent(self, row, col, num):
+        for r, c in self.peers(row, col):
+            if self.givens[r][c] == num:
+                return False
+        return True
+
+    def peers(self, row, col):
+        start_row = (row // self.box_size) * self.box_size
+        start_col = (col // self.box_size) * self.box_size
+        cells = set()
+        for i in range(self.board_size):
+            cells.add((row, i))
+            cells.add((i, col))
+        for r in range(start_row, start_row + self.box_size):
+            for c in range(start_col, start_col + self.box_size):
+                cells.add((r, c))
+        cells.discard((row, col))
+        return cells
+
+    def repair(self, row, col, num):
+        solver = self.solver
+        band = range((row // self.box_size) * self.box_size, (row // self.box_size + 1) * self.box_size)
+        stack = range((col // self.box_size) * self.box_size, (col // self.box_size + 1) * self.box_size)
+        solver.remove_number(row, col, solver.board[row][col])
+        for r in range(self.board_size):
+            for c in range(self.board_size):
+                if (r in band or c in stack) and self.givens[r][c] == 0 and solver.board[r][c] != 0:
+                    solver.remove_number(r, c, solver.board[r][c])
+        solver.place_number(row, col, num)
+        return solver.solve_sudoku()
 
 
 def load_sudoku_grids(filename, grid_size):
@@ -153,25 +383,31 @@ def load_sudoku_grids(filename, grid_size):
 
     return grids
 
-sudoku_size = 16
-sudoku_dir = "sudoku_grids/"
-file_path = f"{sudoku_dir}sudoku_grids_16.txt"
-all_grids_9 = load_sudoku_grids(file_path, sudoku_size)
-t_start_all = time.time()
-for idx, grid in enumerate(all_grids_9):
-    t_start = time.time()
-
-    sudoku = SudokuSolver(grid)
-    print(f"{idx+1} Original Sudoku:")
-    sudoku.print_board()
-    if sudoku.solve_sudoku():
-        duration = time.time() - t_start
-        print(f"{idx+1} Solved Sudoku:")
-        sudoku.print_board()
-    else:
-        duration = time.time() - t_start
-        print(f"{idx+1} No solution exists")
-    print(f"Completion in {duration*1000}ms\n")
-
-full_duration = time.time() - t_start_all
-print(f"Full duration = {full_duration}s")
\ No newline at end of file
+if __name__ == "__main__":
+    from result_writer import make_result, open_result_writer
+
+    sudoku_size = 16
+    sudoku_dir = "sudoku_grids/"
+    file_path = f"{sudoku_dir}sudoku_grids_16.txt"
+    use_transposition_table = False
+    # jsonl, text, binary, or pretty for a boxed debug layout
+    output_format = "text"
+    output_path = None
+    threaded_output = False
+    all_grids_9 = load_sudoku_grids(file_path, sudoku_size)
+    # One table for the whole batch, its stats in each record are cumulative
+    table = TranspositionTable(max_memory_mb=64) if use_transposition_table else None
+    t_start_all = time.time()
+    with open_result_writer(output_format, output_path, threaded=threaded_output) as writer:
+        for idx, grid in enumerate(all_grids_9):
+            t_start = time.time()
+
+            sudoku = SudokuSolver(grid, transposition_table=table)
+            solved = sudoku.solve_sudoku()
+            duration = time.time() - t_start
+
+            stats = table.stats() if table is not None else {}
+            writer.write(make_result(f"{file_path}#{idx+1}", sudoku.board, solved, duration, **stats))
+
+    full_duration = time.time() - t_start_all
+    print(f"Full duration = {full_duration}s", file=sys.stderr)
\ No newline at end of file